@@ -7,8 +7,13 @@ AWS SSM Parameter Store for credential validation.
 """
 
 import os
+import time
 import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from flask import Flask, render_template, request, redirect, url_for, flash, session
 from flask_limiter import Limiter
@@ -22,56 +27,233 @@ app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev-key-change-in-productio
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure rate limiting
+# Configure rate limiting (shared across Lambda containers when REDIS_URL is set)
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
+    storage_uri=os.environ.get('REDIS_URL') or "memory://",
+    strategy="moving-window",
+    # Fall back to per-container limits instead of failing requests if Redis is unreachable
+    in_memory_fallback_enabled=True
 )
 limiter.init_app(app)
 
-# Initialize password manager
-try:
+# Shared AWS session for SSM and EC2. The SSM client keeps the 
+# PasswordManager defaults, which fail fast on the login path.
+REGION = os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')
+_SESSION = boto3.session.Session(region_name=REGION)
+_EC2_CONFIG = Config(max_pool_connections=64, retries={'max_attempts': 8, 'mode': 'adaptive'})
+
+# Seconds to wait before retrying a failed client initialization
+_INIT_RETRY_INTERVAL = 30
+
+
+class _LazyInit:
+    """
+    Creates a shared resource on first use and reuses it across warm invocations.
+    
+    A failed attempt returns None and is retried at most every 
+    _INIT_RETRY_INTERVAL seconds, so a transient failure does not leave a 
+    warm container without the resource until it is recycled.
+    """
+    
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory
+        self._value = None
+        self._failed_at = None
+        self._lock = threading.Lock()
+    
+    def __call__(self):
+        with self._lock:
+            if self._value is None and (
+                self._failed_at is None or time.monotonic() - self._failed_at >= _INIT_RETRY_INTERVAL
+            ):
+                try:
+                    self._value = self._factory()
+                except Exception as e:
+                    logger.error(f"Failed to initialize {self.name}: {e}")
+                    self._failed_at = time.monotonic()
+            return self._value
+
+
+def _create_pm():
     pm = PasswordManager(
         prefix=os.environ.get('SSM_PREFIX', '/passwords/'),
-        region=os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')
+        region=REGION,
+        boto3_session=_SESSION
     )
-    logger.info(f"PasswordManager initialized with prefix: {os.environ.get('SSM_PREFIX', '/passwords/')}, region: {os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')}")
-except Exception as e:
-    logger.error(f"Failed to initialize PasswordManager: {e}")
-    pm = None
+    logger.info(f"PasswordManager initialized with prefix: {os.environ.get('SSM_PREFIX', '/passwords/')}, region: {REGION}")
+    return pm
+
+
+get_pm = _LazyInit('PasswordManager', _create_pm)
+
+
+# DescribeInstances errors caused by a single bad ID in the request
+_INVALID_INSTANCE_ID_ERRORS = ('InvalidInstanceID.NotFound', 'InvalidInstanceID.Malformed')
+
+
+class DescribeInstancesBatcher:
+    """
+    Coalesces concurrent DescribeInstances lookups into a single EC2 call.
+    
+    Lookups submitted while a call is in flight are queued and sent together
+    in the next call, so a lone caller is never delayed waiting for a batch.
+    """
+    
+    def __init__(self, client, max_batch=500):
+        self.client = client
+        self.max_batch = max_batch
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='describe-instances-batcher', daemon=True)
+        self._thread.start()
+    
+    def submit(self, instance_id):
+        """Queue a lookup; the Future resolves to the instance dict, or None if not found."""
+        future = Future()
+        with self._cond:
+            self._pending.setdefault(instance_id, []).append(future)
+            self._cond.notify()
+        return future
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                instance_ids = list(self._pending)[:self.max_batch]
+                batch = {instance_id: self._pending.pop(instance_id) for instance_id in instance_ids}
+            self._flush(batch)
+    
+    def _flush(self, batch):
+        try:
+            try:
+                response = self.client.describe_instances(InstanceIds=list(batch))
+            except ClientError as e:
+                # One bad ID fails the whole call, so look the IDs up one at a time
+                if len(batch) > 1 and e.response['Error']['Code'] in _INVALID_INSTANCE_ID_ERRORS:
+                    for instance_id, futures in batch.items():
+                        self._flush({instance_id: futures})
+                    return
+                raise
+            
+            instances = {
+                instance['InstanceId']: instance
+                for reservation in response['Reservations']
+                for instance in reservation['Instances']
+            }
+            for instance_id, futures in batch.items():
+                for future in futures:
+                    future.set_result(instances.get(instance_id))
+        except Exception as e:
+            # Always resolve the batch so callers never wait on a lost lookup
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
 
-# Initialize EC2 client for instance status checking
-try:
-    ec2_client = boto3.client('ec2', region_name=os.environ.get('AWS_DEFAULT_REGION', 'us-east-1'))
-    logger.info(f"EC2 client initialized for region: {os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')}")
-except Exception as e:
-    logger.error(f"Failed to initialize EC2 client: {e}")
-    ec2_client = None
+def _create_ec2():
+    # The EC2 service model is large and only the dashboard needs it, so it 
+    # is loaded on first use rather than on every cold start
+    client = _SESSION.client('ec2', config=_EC2_CONFIG)
+    logger.info(f"EC2 client initialized for region: {REGION}")
+    return client, DescribeInstancesBatcher(client)
+
+
+# EC2 client and DescribeInstances batcher
+get_ec2 = _LazyInit('EC2 client', _create_ec2)
+
+_DESCRIBE_TIMEOUT = 5
+
+# Dashboard instance details by DescribeInstances response key
+_EC2_FIELDS = {
+    'instance_type': 'InstanceType',
+    'launch_time': 'LaunchTime',
+    'private_ip': 'PrivateIpAddress',
+    'public_ip': 'PublicIpAddress'
+}
+
+# Instance details by ID, with the instance state and time they were fetched
+_instance_details = {}
+_INSTANCE_DETAILS_TTL = int(os.environ.get('INSTANCE_DETAILS_CACHE_TTL', '60'))
+
+
+def _instance_fields(instance):
+    """Extract dashboard details from a DescribeInstances record."""
+    details = {key: instance.get(field, 'N/A') for key, field in _EC2_FIELDS.items()}
+    if isinstance(details['launch_time'], datetime):
+        details['launch_time'] = details['launch_time'].astimezone(timezone.utc).isoformat()
+    return details
+
+
+# Short-lived cache of instance status to absorb rapid dashboard refreshes
+_status_cache = {}
+_status_cache_lock = threading.Lock()
+_STATUS_CACHE_TTL = int(os.environ.get('INSTANCE_STATUS_CACHE_TTL', '3'))
 
 
 def get_instance_status(instance_id):
+    """Get the status of an EC2 instance, cached for a few seconds."""
+    with _status_cache_lock:
+        entry = _status_cache.get(instance_id)
+    if entry and time.monotonic() - entry[0] < _STATUS_CACHE_TTL:
+        return entry[1]
+    
+    status_info = _fetch_instance_status(instance_id)
+    if status_info['status'] != 'error':
+        with _status_cache_lock:
+            _status_cache[instance_id] = (time.monotonic(), status_info)
+    return status_info
+
+
+def _fetch_instance_status(instance_id):
     """Get the status of an EC2 instance."""
-    if not ec2_client or not instance_id:
+    ec2 = get_ec2()
+    if not ec2 or not instance_id:
         return {
             'status': 'unknown',
             'state': 'N/A',
             'error': 'EC2 client not available or instance ID not configured'
         }
+    ec2_client, describe_batcher = ec2
     
     try:
         logger.info(f"Checking status for instance: {instance_id}")
-        response = ec2_client.describe_instances(InstanceIds=[instance_id])
+        # State and status checks come back in one call, including for stopped instances
+        status_response = ec2_client.describe_instance_status(
+            InstanceIds=[instance_id],
+            IncludeAllInstances=True
+        )
         
-        if not response['Reservations']:
+        if not status_response['InstanceStatuses']:
             return {
                 'status': 'not_found',
                 'state': 'N/A', 
                 'error': f'Instance {instance_id} not found'
             }
         
-        instance = response['Reservations'][0]['Instances'][0]
-        instance_state = instance['State']['Name']
+        status_check = status_response['InstanceStatuses'][0]
+        instance_state = status_check['InstanceState']['Name']
+        
+        # Instance details mostly change across state transitions, so reuse them until
+        # the state moves; the TTL picks up changes made in place, like an Elastic IP
+        cached = _instance_details.get(instance_id)
+        if (cached and cached[0] == instance_state
+                and time.monotonic() - cached[1] < _INSTANCE_DETAILS_TTL):
+            details = cached[2]
+        else:
+            instance = describe_batcher.submit(instance_id).result(timeout=_DESCRIBE_TIMEOUT)
+            if instance is None:
+                return {
+                    'status': 'not_found',
+                    'state': 'N/A', 
+                    'error': f'Instance {instance_id} not found'
+                }
+            details = _instance_fields(instance)
+            _instance_details[instance_id] = (instance_state, time.monotonic(), details)
         
         # Auto-start instance if it's stopped
         auto_started = False
@@ -86,33 +268,16 @@ def get_instance_status(instance_id):
                 logger.error(f"Failed to auto-start instance {instance_id}: {start_error}")
                 # Continue with the original stopped state
         
-        # Get instance status checks
-        status_response = ec2_client.describe_instance_status(InstanceIds=[instance_id])
-        
         status_info = {
             'instance_id': instance_id,
             'state': instance_state,
-            'instance_type': instance.get('InstanceType', 'N/A'),
-            'launch_time': instance.get('LaunchTime', 'N/A'),
-            'private_ip': instance.get('PrivateIpAddress', 'N/A'),
-            'public_ip': instance.get('PublicIpAddress', 'N/A'),
+            **details,
             'status': 'running' if instance_state == 'running' else instance_state,
-            'auto_started': auto_started
+            'auto_started': auto_started,
+            'system_status': status_check['SystemStatus']['Status'],
+            'instance_status': status_check['InstanceStatus']['Status']
         }
         
-        # Add status checks if available
-        if status_response['InstanceStatuses']:
-            status_check = status_response['InstanceStatuses'][0]
-            status_info.update({
-                'system_status': status_check['SystemStatus']['Status'],
-                'instance_status': status_check['InstanceStatus']['Status']
-            })
-        else:
-            status_info.update({
-                'system_status': 'N/A',
-                'instance_status': 'N/A'
-            })
-        
         logger.info(f"Instance {instance_id} status: {instance_state}")
         return status_info
         
@@ -125,6 +290,14 @@ def get_instance_status(instance_id):
         else:
             error_msg = f'AWS error: {e.response["Error"]["Message"]}'
         
+        logger.error(f"Error checking instance {instance_id}: {error_msg}")
+        return {
+            'status': 'error',
+            'state': 'N/A',
+            'error': error_msg
+        }
+    except FutureTimeoutError:
+        error_msg = f'Timed out after {_DESCRIBE_TIMEOUT}s describing instance {instance_id}'
         logger.error(f"Error checking instance {instance_id}: {error_msg}")
         return {
             'status': 'error',
@@ -170,6 +343,7 @@ def login():
         
         logger.info(f"Login attempt for username: '{username}'")
         
+        pm = get_pm()
         if not pm:
             logger.error("PasswordManager not initialized")
             flash('System error: Password manager not available', 'error')
@@ -181,28 +355,17 @@ def login():
             return render_template('login.html')
         
         try:
-            # Check if login exists and verify password
-            logger.info(f"Checking if login exists: '{username}'")
-            exists = pm.login_exists(username)
-            logger.info(f"Login exists result for '{username}': {exists}")
-            
-            if exists:
-                logger.info(f"Attempting to get password for '{username}'")
-                stored_password = pm.get_password(username)
-                logger.info(f"Retrieved password for '{username}' (length: {len(stored_password) if stored_password else 0})")
-                
-                if password == stored_password:
-                    # Successful login
-                    logger.info(f"Successful login for '{username}'")
-                    session['logged_in'] = True
-                    session['username'] = username
-                    flash(f'Welcome, {username}!', 'success')
-                    return redirect(url_for('index'))
-                else:
-                    logger.warning(f"Password mismatch for '{username}' - provided: {len(password)} chars, stored: {len(stored_password) if stored_password else 0} chars")
-                    flash('Invalid username or password', 'error')
+            # Verify password with a single SSM lookup
+            logger.info(f"Verifying password for '{username}'")
+            if pm.verify_password(username, password):
+                # Successful login
+                logger.info(f"Successful login for '{username}'")
+                session['logged_in'] = True
+                session['username'] = username
+                flash(f'Welcome, {username}!', 'success')
+                return redirect(url_for('index'))
             else:
-                logger.warning(f"Login does not exist: '{username}'")
+                logger.warning(f"Invalid credentials for '{username}'")
                 flash('Invalid username or password', 'error')
         
         except PasswordManagerError as e:
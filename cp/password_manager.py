@@ -9,7 +9,7 @@ Uses the ssm_password_manager library for all operations.
 import argparse
 import sys
 from ssm_password_manager import (
-    PasswordManager,
+    get_password_manager,
     PasswordManagerError,
     LoginNotFoundError,
     LoginAlreadyExistsError,
@@ -62,7 +62,7 @@ def main():
         return
     
     try:
-        pm = PasswordManager(args.prefix, args.region)
+        pm = get_password_manager(args.prefix, args.region)
         
         if args.command == 'list':
             logins = pm.list_logins()
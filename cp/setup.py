@@ -41,6 +41,7 @@ setup(
             "moto[ssm]>=4.2.0",
             "pytest>=7.0.0",
             "pytest-cov>=4.0.0",
+            "pytest-xdist>=3.0.0",
         ],
         "cli": [
             "click>=8.0.0",
@@ -5,7 +5,7 @@ A Python library for managing login-password pairs stored as SecureString parame
 in AWS SSM Parameter Store.
 """
 
-from .password_manager import PasswordManager
+from .password_manager import PasswordManager, get_password_manager
 from .exceptions import (
     PasswordManagerError,
     LoginNotFoundError,
@@ -20,6 +20,7 @@ __email__ = "noreply@example.com"
 
 __all__ = [
     "PasswordManager",
+    "get_password_manager",
     "PasswordManagerError",
     "LoginNotFoundError", 
     "LoginAlreadyExistsError",
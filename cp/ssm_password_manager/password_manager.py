@@ -5,11 +5,16 @@ Core library for managing login-password pairs stored as SecureString parameters
 in AWS SSM Parameter Store.
 """
 
+import functools
+import hmac
+import os
 import secrets
 import string
+import time
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from .exceptions import (
     PasswordManagerError,
@@ -20,44 +25,75 @@ from .exceptions import (
 )
 
 
+# Characters used for generated passwords
+_ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*"
+# Bytes at or above this value are discarded so every character is equally likely
+_BYTE_LIMIT = 256 - 256 % len(_ALPHABET)
+
+
 class PasswordManager:
     """
     Manages login-password pairs in AWS SSM Parameter Store.
     
     Each login is stored as a separate SecureString parameter with the naming 
     convention: {prefix}{login}
+    
+    Passwords read via get_password are cached in-process for SSM_CACHE_TTL
+    seconds (default: 5, 0 disables caching).
     """
     
-    def __init__(self, prefix: str = "/passwords/", region: str = None):
+    def __init__(self, prefix: str = "/passwords/", region: str = None,
+                 boto3_session: Optional[boto3.session.Session] = None,
+                 config: Optional[Config] = None):
         """
         Initialize the password manager with AWS SSM client.
         
         Args:
             prefix: Parameter name prefix (default: "/passwords/")
             region: AWS region (optional, uses default region if not specified)
+            boto3_session: Session to create the SSM client from (optional, 
+                uses the default session if not specified)
+            config: botocore client configuration (optional, merged over 
+                the library defaults)
         """
+        # Retries and timeouts are kept short so interactive logins fail fast
+        client_config = Config(
+            retries={'max_attempts': 2, 'mode': 'adaptive'},
+            connect_timeout=1.0,
+            read_timeout=3.0,
+            tcp_keepalive=True,
+            max_pool_connections=32
+        )
+        if config is not None:
+            client_config = client_config.merge(config)
+        
         try:
+            session = boto3_session or boto3
             if region:
-                self.ssm = boto3.client('ssm', region_name=region)
+                self.ssm = session.client('ssm', region_name=region, config=client_config)
             else:
-                self.ssm = boto3.client('ssm')
+                self.ssm = session.client('ssm', config=client_config)
             self.prefix = prefix
+            self._cache: Dict[str, Tuple[float, str]] = {}
+            self._ttl = int(os.environ.get('SSM_CACHE_TTL', '5'))
         except NoCredentialsError:
             raise AWSError("AWS credentials not configured. Please configure AWS CLI or set environment variables.")
     
-    def list_logins(self) -> List[str]:
+    def iter_logins(self) -> Iterator[str]:
         """
-        List all available logins.
+        Iterate over all available logins as they are fetched.
         
-        Returns:
-            List of login names in sorted order
+        Logins are yielded page by page in the order SSM returns them, so 
+        the first results are available before the whole listing is fetched.
+        
+        Yields:
+            Login names, unsorted
             
         Raises:
             AWSError: If AWS operation fails
         """
         try:
             paginator = self.ssm.get_paginator('describe_parameters')
-            logins = []
             
             for page in paginator.paginate(
                 ParameterFilters=[
@@ -66,16 +102,26 @@ class PasswordManager:
                         'Option': 'BeginsWith',
                         'Values': [self.prefix]
                     }
-                ]
+                ],
+                PaginationConfig={'PageSize': 50}
             ):
                 for param in page['Parameters']:
-                    login = param['Name'][len(self.prefix):]
-                    logins.append(login)
-            
-            return sorted(logins)
+                    yield param['Name'][len(self.prefix):]
         except ClientError as e:
             raise AWSError(f"Failed to list logins: {e}")
     
+    def list_logins(self) -> List[str]:
+        """
+        List all available logins.
+        
+        Returns:
+            List of login names in sorted order
+            
+        Raises:
+            AWSError: If AWS operation fails
+        """
+        return sorted(self.iter_logins())
+    
     def create_login(self, login: str, password: str = None) -> str:
         """
         Create a new login with password.
@@ -146,7 +192,7 @@ class PasswordManager:
         
         try:
             # Update parameter value without tags (can't use tags with Overwrite=True)
-            self.ssm.put_parameter(
+            response = self.ssm.put_parameter(
                 Name=param_name,
                 Value=password,
                 Type='SecureString',
@@ -154,23 +200,26 @@ class PasswordManager:
                 Description=f"Password for login: {login}"
             )
             
-            # Update tags separately
-            self.ssm.add_tags_to_resource(
-                ResourceType='Parameter',
-                ResourceId=param_name,
-                Tags=[
-                    {
-                        'Key': 'Type',
-                        'Value': 'Password'
-                    },
-                    {
-                        'Key': 'Login',
-                        'Value': login
-                    }
-                ]
-            )
+            # Existing tags survive an overwrite; only tag parameters this call created
+            if response['Version'] == 1:
+                self.ssm.add_tags_to_resource(
+                    ResourceType='Parameter',
+                    ResourceId=param_name,
+                    Tags=[
+                        {
+                            'Key': 'Type',
+                            'Value': 'Password'
+                        },
+                        {
+                            'Key': 'Login',
+                            'Value': login
+                        }
+                    ]
+                )
         except ClientError as e:
             raise AWSError(f"Failed to update login: {e}")
+        finally:
+            self._cache.pop(param_name, None)
     
     def delete_login(self, login: str) -> None:
         """
@@ -196,6 +245,8 @@ class PasswordManager:
                 raise LoginNotFoundError(f"Login '{login}' not found")
             else:
                 raise AWSError(f"Failed to delete login: {e}")
+        finally:
+            self._cache.pop(param_name, None)
     
     def get_password(self, login: str) -> str:
         """
@@ -217,9 +268,15 @@ class PasswordManager:
         
         param_name = f"{self.prefix}{login}"
         
+        entry = self._cache.get(param_name)
+        if entry and time.monotonic() - entry[0] < self._ttl:
+            return entry[1]
+        
         try:
             response = self.ssm.get_parameter(Name=param_name, WithDecryption=True)
-            return response['Parameter']['Value']
+            password = response['Parameter']['Value']
+            self._cache[param_name] = (time.monotonic(), password)
+            return password
         except ClientError as e:
             if e.response['Error']['Code'] == 'ParameterNotFound':
                 raise LoginNotFoundError(f"Login '{login}' not found")
@@ -245,8 +302,15 @@ class PasswordManager:
         if not login:
             raise ValidationError("Login cannot be empty")
         
-        # Verify login exists first
-        self.get_password(login)  # This will raise LoginNotFoundError if not found
+        # Verify login exists first: put_parameter with Overwrite=True would 
+        # create it otherwise. Read without decryption and bypass the cache.
+        try:
+            self.ssm.get_parameter(Name=f"{self.prefix}{login}", WithDecryption=False)
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ParameterNotFound':
+                raise LoginNotFoundError(f"Login '{login}' not found")
+            else:
+                raise AWSError(f"Failed to rotate password: {e}")
         
         new_password = self._generate_password(length)
         self.update_login(login, new_password)
@@ -274,6 +338,28 @@ class PasswordManager:
         except LoginNotFoundError:
             return False
     
+    def verify_password(self, login: str, password: str) -> bool:
+        """
+        Check a password against the stored password for a login.
+        
+        Args:
+            login: Login name
+            password: Password to verify
+            
+        Returns:
+            True if login exists and password matches, False otherwise
+            
+        Raises:
+            ValidationError: If login is empty
+            AWSError: If AWS operation fails
+        """
+        try:
+            stored_password = self.get_password(login)
+        except LoginNotFoundError:
+            return False
+        
+        return hmac.compare_digest(stored_password.encode('utf-8'), (password or '').encode('utf-8'))
+    
     def get_login_info(self, login: str) -> Dict[str, str]:
         """
         Get detailed information about a login parameter.
@@ -331,6 +417,30 @@ class PasswordManager:
         if length < 8:
             length = 8
         
-        alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
-        password = ''.join(secrets.choice(alphabet) for _ in range(length))
-        return password
\ No newline at end of file
+        # Draw entropy in bulk rather than one os.urandom call per character
+        chars = []
+        while len(chars) < length:
+            chars.extend(
+                _ALPHABET[b % len(_ALPHABET)]
+                for b in secrets.token_bytes(length * 2)
+                if b < _BYTE_LIMIT
+            )
+        return ''.join(chars[:length])
+
+
+@functools.lru_cache(maxsize=8)
+def get_password_manager(prefix: str = "/passwords/", region: str = None) -> PasswordManager:
+    """
+    Get a shared PasswordManager for a prefix and region.
+    
+    Repeated calls with the same arguments return the same instance, so its 
+    SSM client and password cache are reused.
+    
+    Args:
+        prefix: Parameter name prefix (default: "/passwords/")
+        region: AWS region (optional, uses default region if not specified)
+        
+    Returns:
+        PasswordManager instance
+    """
+    return PasswordManager(prefix, region)
\ No newline at end of file
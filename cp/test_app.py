@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Test suite for the Flask login app
+
+Uses moto library to mock AWS services.
+"""
+
+import os
+import unittest
+from concurrent.futures import Future, TimeoutError
+from unittest.mock import MagicMock, patch
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+
+def setUpModule():
+    # Importing app builds its boto3 session from the default region, and
+    # fake credentials keep any client it creates away from real AWS
+    os.environ['AWS_ACCESS_KEY_ID'] = 'testing'
+    os.environ['AWS_SECRET_ACCESS_KEY'] = 'testing'
+    os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+class TestDescribeInstancesBatcher(unittest.TestCase):
+    """Test cases for DescribeInstancesBatcher."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Start the AWS mock and launch one instance."""
+        cls.mock = mock_aws()
+        cls.mock.start()
+        from app import DescribeInstancesBatcher
+        cls.batcher_class = DescribeInstancesBatcher
+        cls.ec2 = boto3.client('ec2', region_name='us-east-1')
+        cls.instance_id = cls.ec2.run_instances(
+            ImageId='ami-12c6146b', MinCount=1, MaxCount=1
+        )['Instances'][0]['InstanceId']
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.mock.stop()
+    
+    def submit_together(self, batcher, instance_ids):
+        """Submit lookups while holding the batcher lock so they land in one batch."""
+        with batcher._cond:
+            return [batcher.submit(instance_id) for instance_id in instance_ids]
+    
+    def test_batched_lookup(self):
+        """Test concurrent lookups resolve from a single call."""
+        batcher = self.batcher_class(self.ec2)
+        futures = self.submit_together(batcher, [self.instance_id, self.instance_id])
+        
+        for future in futures:
+            self.assertEqual(future.result(timeout=5)['InstanceId'], self.instance_id)
+    
+    def test_mixed_valid_and_invalid_ids(self):
+        """Test an invalid ID does not fail lookups batched with it."""
+        batcher = self.batcher_class(self.ec2)
+        valid, invalid = self.submit_together(batcher, [self.instance_id, 'i-0123456789abcdef0'])
+        
+        self.assertEqual(valid.result(timeout=5)['InstanceId'], self.instance_id)
+        with self.assertRaises(ClientError) as ctx:
+            invalid.result(timeout=5)
+        self.assertEqual(ctx.exception.response['Error']['Code'], 'InvalidInstanceID.NotFound')
+    
+    def test_unexpected_error_resolves_batch(self):
+        """Test a failure while handling the response resolves callers and keeps the batcher alive."""
+        client = MagicMock()
+        client.describe_instances.return_value = {}
+        batcher = self.batcher_class(client)
+        
+        with self.assertRaises(KeyError):
+            batcher.submit(self.instance_id).result(timeout=5)
+        
+        client.describe_instances.return_value = {'Reservations': []}
+        try:
+            self.assertIsNone(batcher.submit(self.instance_id).result(timeout=5))
+        except TimeoutError:
+            self.fail("Batcher thread stopped after an unexpected error")
+
+
+class TestFetchInstanceStatus(unittest.TestCase):
+    """Test cases for _fetch_instance_status with a stubbed EC2 client."""
+    
+    instance_id = 'i-0123456789abcdef0'
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the app module."""
+        import app
+        cls.app = app
+    
+    def setUp(self):
+        """Stub the EC2 client and batcher and clear cached details."""
+        self.app._instance_details.clear()
+        self.client = MagicMock()
+        self.batcher = MagicMock()
+        self.batcher.submit.side_effect = lambda instance_id: self.resolved({
+            'InstanceId': instance_id,
+            'InstanceType': 't3.micro',
+            'PrivateIpAddress': '10.0.0.1',
+            'PublicIpAddress': '203.0.113.1'
+        })
+        self.set_state('running')
+        patcher = patch.object(self.app, 'get_ec2', return_value=(self.client, self.batcher))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def resolved(self, instance):
+        """Return a future already resolved with a DescribeInstances record."""
+        future = Future()
+        future.set_result(instance)
+        return future
+    
+    def set_state(self, state, status='ok'):
+        """Make DescribeInstanceStatus report the given state and status checks."""
+        self.client.describe_instance_status.return_value = {'InstanceStatuses': [{
+            'InstanceState': {'Name': state},
+            'SystemStatus': {'Status': status},
+            'InstanceStatus': {'Status': status}
+        }]}
+    
+    def test_details_reused_while_state_unchanged(self):
+        """Test details are described once while the instance stays in the same state."""
+        first = self.app._fetch_instance_status(self.instance_id)
+        second = self.app._fetch_instance_status(self.instance_id)
+        
+        self.assertEqual(self.batcher.submit.call_count, 1)
+        self.assertEqual(first['public_ip'], '203.0.113.1')
+        self.assertEqual(second, first)
+    
+    def test_details_refetched_on_state_change(self):
+        """Test details are described again after the instance changes state."""
+        self.app._fetch_instance_status(self.instance_id)
+        self.set_state('stopping')
+        status_info = self.app._fetch_instance_status(self.instance_id)
+        
+        self.assertEqual(self.batcher.submit.call_count, 2)
+        self.assertEqual(status_info['state'], 'stopping')
+    
+    def test_details_refetched_after_ttl(self):
+        """Test details are described again once they are older than the TTL."""
+        with patch.object(self.app.time, 'monotonic', return_value=1000.0):
+            self.app._fetch_instance_status(self.instance_id)
+        self.batcher.submit.side_effect = lambda instance_id: self.resolved({
+            'InstanceId': instance_id,
+            'PublicIpAddress': '203.0.113.2'
+        })
+        
+        with patch.object(self.app.time, 'monotonic', return_value=1000.0 + self.app._INSTANCE_DETAILS_TTL):
+            status_info = self.app._fetch_instance_status(self.instance_id)
+        
+        self.assertEqual(self.batcher.submit.call_count, 2)
+        self.assertEqual(status_info['public_ip'], '203.0.113.2')
+    
+    def test_not_applicable_status_checks(self):
+        """Test status checks that do not apply to the current state are passed through."""
+        self.set_state('stopping', status='not-applicable')
+        status_info = self.app._fetch_instance_status(self.instance_id)
+        
+        self.assertEqual(status_info['status'], 'stopping')
+        self.assertEqual(status_info['system_status'], 'not-applicable')
+        self.assertEqual(status_info['instance_status'], 'not-applicable')
+        self.assertEqual(status_info['instance_type'], 't3.micro')
+
+
+class TestInstanceStatusCache(unittest.TestCase):
+    """Test cases for the get_instance_status TTL cache."""
+    
+    instance_id = 'i-0123456789abcdef0'
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the app module."""
+        import app
+        cls.app = app
+    
+    def setUp(self):
+        """Stub the status lookup and clear the cache."""
+        self.app._status_cache.clear()
+        patcher = patch.object(self.app, '_fetch_instance_status', return_value={
+            'instance_id': self.instance_id,
+            'state': 'running',
+            'status': 'running'
+        })
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def get_status_at(self, now):
+        """Call get_instance_status with time.monotonic() returning now."""
+        with patch.object(self.app.time, 'monotonic', return_value=now):
+            return self.app.get_instance_status(self.instance_id)
+    
+    def test_hit_within_ttl(self):
+        """Test a cached status is returned without an EC2 call within the TTL."""
+        first = self.get_status_at(1000.0)
+        second = self.get_status_at(1000.0 + self.app._STATUS_CACHE_TTL - 0.5)
+        
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(second, first)
+    
+    def test_refetch_after_ttl(self):
+        """Test an expired status is fetched again."""
+        self.get_status_at(1000.0)
+        self.get_status_at(1000.0 + self.app._STATUS_CACHE_TTL)
+        
+        self.assertEqual(self.fetch.call_count, 2)
+    
+    def test_error_not_cached(self):
+        """Test error results are not stored, so the next call retries."""
+        self.fetch.return_value = {'status': 'error', 'state': 'N/A', 'error': 'AWS error'}
+        self.get_status_at(1000.0)
+        self.get_status_at(1000.0)
+        
+        self.assertEqual(self.fetch.call_count, 2)
+        self.assertNotIn(self.instance_id, self.app._status_cache)
+
+
+class TestLazyInit(unittest.TestCase):
+    """Test cases for _LazyInit."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the app module."""
+        import app
+        cls.app = app
+    
+    def setUp(self):
+        """Build a factory that fails once and then succeeds."""
+        self.factory = MagicMock(side_effect=[RuntimeError("unavailable"), "resource"])
+        self.lazy = self.app._LazyInit('test resource', self.factory)
+    
+    def call_at(self, now):
+        """Call the _LazyInit with time.monotonic() returning now."""
+        with patch.object(self.app.time, 'monotonic', return_value=now):
+            return self.lazy()
+    
+    def test_success_cached(self):
+        """Test a created resource is reused without calling the factory again."""
+        self.factory.side_effect = None
+        self.factory.return_value = "resource"
+        
+        self.assertEqual(self.call_at(1000.0), "resource")
+        self.assertEqual(self.call_at(1000.0 + self.app._INIT_RETRY_INTERVAL), "resource")
+        self.assertEqual(self.factory.call_count, 1)
+    
+    def test_failure_not_retried_within_interval(self):
+        """Test a failure returns None without retrying inside the retry interval."""
+        self.assertIsNone(self.call_at(1000.0))
+        self.assertIsNone(self.call_at(1000.0 + self.app._INIT_RETRY_INTERVAL - 1))
+        self.assertEqual(self.factory.call_count, 1)
+    
+    def test_failure_retried_after_interval(self):
+        """Test a failure is retried once the retry interval has passed."""
+        self.assertIsNone(self.call_at(1000.0))
+        self.assertEqual(self.call_at(1000.0 + self.app._INIT_RETRY_INTERVAL), "resource")
+        self.assertEqual(self.call_at(1000.0 + self.app._INIT_RETRY_INTERVAL + 1), "resource")
+        self.assertEqual(self.factory.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -5,13 +5,16 @@ Test suite for SSM Password Manager Library
 Uses moto library to mock AWS services for comprehensive testing.
 """
 
+import os
 import unittest
 import boto3
 import json
 from unittest.mock import patch, MagicMock
 from moto import mock_aws
+from moto.core.base_backend import BackendDict
 from ssm_password_manager import (
     PasswordManager,
+    get_password_manager,
     PasswordManagerError,
     LoginNotFoundError,
     LoginAlreadyExistsError,
@@ -20,21 +23,49 @@ from ssm_password_manager import (
 )
 import argparse
 import io
+import string
 import sys
 from contextlib import redirect_stdout, redirect_stderr
 
 
+_sleep_patcher = patch('time.sleep', return_value=None)
+
+# Shared session so botocore loads the SSM service model once for all clients
+_SESSION = boto3.session.Session()
+
+
+def setUpModule():
+    """Never block on botocore retry backoff while tests run."""
+    _sleep_patcher.start()
+    # Clients are built outside the mock, so give them fake credentials
+    os.environ['AWS_ACCESS_KEY_ID'] = 'testing'
+    os.environ['AWS_SECRET_ACCESS_KEY'] = 'testing'
+    os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
+
+
+def tearDownModule():
+    _sleep_patcher.stop()
+
+
 class TestPasswordManagerLibrary(unittest.TestCase):
     """Test cases for PasswordManager library."""
     
-    @mock_aws
+    @classmethod
+    def setUpClass(cls):
+        """Start the AWS mock once and create one PasswordManager shared by all tests."""
+        cls.mock = mock_aws()
+        cls.mock.start()
+        cls.pm = PasswordManager("/test-passwords/", boto3_session=_SESSION)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.mock.stop()
+    
     def setUp(self):
-        """Set up test environment with mocked AWS services."""
-        import os
-        os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
-        self.pm = PasswordManager("/test-passwords/")
+        """Start each test with an empty store by resetting moto's in-memory backends."""
+        BackendDict.reset()
+        self.pm._cache.clear()
         
-    @mock_aws
     def test_create_login_with_generated_password(self):
         """Test creating login with auto-generated password."""
         password = self.pm.create_login("testuser")
@@ -47,7 +78,6 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         stored_password = self.pm.get_password("testuser")
         self.assertEqual(password, stored_password)
     
-    @mock_aws
     def test_create_login_with_custom_password(self):
         """Test creating login with custom password."""
         custom_password = "MyCustomPassword123!"
@@ -57,7 +87,6 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         stored_password = self.pm.get_password("testuser")
         self.assertEqual(stored_password, custom_password)
     
-    @mock_aws
     def test_create_duplicate_login(self):
         """Test creating duplicate login should fail."""
         self.pm.create_login("testuser", "password123")
@@ -65,7 +94,6 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         with self.assertRaises(LoginAlreadyExistsError):
             self.pm.create_login("testuser", "password456")
     
-    @mock_aws
     def test_update_login(self):
         """Test updating existing login password."""
         # Create initial login
@@ -79,7 +107,24 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         stored_password = self.pm.get_password("testuser")
         self.assertEqual(stored_password, new_password)
     
-    @mock_aws
+    def test_update_login_tags(self):
+        """Test updates keep existing tags and tag newly created parameters."""
+        self.pm.create_login("testuser", "oldpassword")
+        
+        with patch.object(self.pm.ssm, 'add_tags_to_resource', wraps=self.pm.ssm.add_tags_to_resource) as add_tags:
+            self.pm.update_login("testuser", "newpassword123")
+            add_tags.assert_not_called()
+        
+            self.pm.update_login("newuser", "password123")
+            add_tags.assert_called_once()
+        
+        for login in ("testuser", "newuser"):
+            tags = self.pm.ssm.list_tags_for_resource(
+                ResourceType='Parameter',
+                ResourceId=f"/test-passwords/{login}"
+            )['TagList']
+            self.assertIn({'Key': 'Login', 'Value': login}, tags)
+
     def test_delete_login(self):
         """Test deleting login."""
         # Create login
@@ -95,13 +140,11 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         with self.assertRaises(LoginNotFoundError):
             self.pm.get_password("testuser")
     
-    @mock_aws
     def test_delete_nonexistent_login(self):
         """Test deleting non-existent login should fail."""
         with self.assertRaises(LoginNotFoundError):
             self.pm.delete_login("nonexistent")
     
-    @mock_aws
     def test_list_logins(self):
         """Test listing all logins."""
         # Initially empty
@@ -117,7 +160,17 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         logins = self.pm.list_logins()
         self.assertEqual(logins, ["user1", "user2", "user3"])
     
-    @mock_aws
+    def test_iter_logins(self):
+        """Test iterating over logins across result pages."""
+        self.assertEqual(list(self.pm.iter_logins()), [])
+        
+        expected = [f"user{i:02d}" for i in range(55)]
+        for login in expected:
+            self.pm.create_login(login, "password123")
+        
+        self.assertEqual(sorted(self.pm.iter_logins()), expected)
+        self.assertEqual(self.pm.list_logins(), expected)
+    
     def test_rotate_password(self):
         """Test password rotation."""
         # Create initial login
@@ -135,7 +188,6 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         stored_password = self.pm.get_password("testuser")
         self.assertEqual(stored_password, new_password)
     
-    @mock_aws
     def test_rotate_password_custom_length(self):
         """Test password rotation with custom length."""
         self.pm.create_login("testuser", "oldpass")
@@ -143,19 +195,40 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         new_password = self.pm.rotate_password("testuser", length=24)
         self.assertEqual(len(new_password), 24)
     
-    @mock_aws
     def test_rotate_nonexistent_login(self):
         """Test rotating password for non-existent login should fail."""
         with self.assertRaises(LoginNotFoundError):
             self.pm.rotate_password("nonexistent")
     
-    @mock_aws
+    def test_rotate_deleted_login_not_recreated(self):
+        """Test rotating a cached login deleted elsewhere fails without recreating it."""
+        self.pm.create_login("testuser", "password123")
+        self.pm.get_password("testuser")
+        self.pm.ssm.delete_parameter(Name="/test-passwords/testuser")
+        
+        with self.assertRaises(LoginNotFoundError):
+            self.pm.rotate_password("testuser")
+        self.assertEqual(self.pm.list_logins(), [])
+
+    def test_get_password_cached(self):
+        """Test repeated reads are served from cache until invalidated."""
+        self.pm.create_login("testuser", "password123")
+        
+        with patch.object(self.pm.ssm, 'get_parameter', wraps=self.pm.ssm.get_parameter) as get_parameter:
+            self.assertEqual(self.pm.get_password("testuser"), "password123")
+            self.assertEqual(self.pm.get_password("testuser"), "password123")
+            self.assertEqual(get_parameter.call_count, 1)
+        
+            # Updates invalidate the cached value
+            self.pm.update_login("testuser", "newpassword123")
+            self.assertEqual(self.pm.get_password("testuser"), "newpassword123")
+            self.assertEqual(get_parameter.call_count, 2)
+
     def test_get_nonexistent_password(self):
         """Test getting password for non-existent login should fail."""
         with self.assertRaises(LoginNotFoundError):
             self.pm.get_password("nonexistent")
     
-    @mock_aws
     def test_login_exists(self):
         """Test checking if login exists."""
         # Initially doesn't exist
@@ -172,8 +245,19 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         
         # Doesn't exist again
         self.assertFalse(self.pm.login_exists("testuser"))
-    
-    @mock_aws
+
+    def test_verify_password(self):
+        """Test verifying passwords against stored value."""
+        # Unknown login never verifies
+        self.assertFalse(self.pm.verify_password("testuser", "password123"))
+        
+        self.pm.create_login("testuser", "password123")
+        
+        self.assertTrue(self.pm.verify_password("testuser", "password123"))
+        self.assertFalse(self.pm.verify_password("testuser", "password124"))
+        self.assertFalse(self.pm.verify_password("testuser", "пароль"))
+        self.assertFalse(self.pm.verify_password("testuser", ""))
+
     def test_get_login_info(self):
         """Test getting detailed login information."""
         self.pm.create_login("testuser", "password123")
@@ -189,37 +273,103 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         self.assertEqual(info['type'], 'SecureString')
         self.assertIn("testuser", info['description'])
     
-    @mock_aws
     def test_get_login_info_nonexistent(self):
         """Test getting info for non-existent login should fail."""
         with self.assertRaises(LoginNotFoundError):
             self.pm.get_login_info("nonexistent")
     
-    def test_validation_errors(self):
-        """Test validation for empty inputs."""
-        with self.assertRaises(ValidationError):
-            self.pm.create_login("")
-        
-        with self.assertRaises(ValidationError):
-            self.pm.update_login("", "password")
-        
-        with self.assertRaises(ValidationError):
-            self.pm.update_login("user", "")
-        
-        with self.assertRaises(ValidationError):
-            self.pm.delete_login("")
-        
-        with self.assertRaises(ValidationError):
-            self.pm.get_password("")
+    def test_workflow_ordering(self):
+        """Test complete workflow: create, list, get, update, rotate, delete."""
+        with self.subTest(step="create"):
+            self.assertEqual(self.pm.list_logins(), [])
+            password = self.pm.create_login("testuser")
+            self.assertTrue(self.pm.login_exists("testuser"))
+            self.assertEqual(self.pm.list_logins(), ["testuser"])
+            self.assertEqual(self.pm.get_password("testuser"), password)
+            self.assertEqual(self.pm.get_login_info("testuser")['type'], 'SecureString')
+        
+        with self.subTest(step="update"):
+            self.pm.update_login("testuser", "updated_password_123")
+            self.assertEqual(self.pm.get_password("testuser"), "updated_password_123")
+        
+        with self.subTest(step="rotate"):
+            rotated_password = self.pm.rotate_password("testuser")
+            self.assertNotEqual(rotated_password, "updated_password_123")
+            self.assertEqual(self.pm.get_password("testuser"), rotated_password)
+        
+        with self.subTest(step="delete"):
+            self.pm.delete_login("testuser")
+            self.assertEqual(self.pm.list_logins(), [])
+            self.assertFalse(self.pm.login_exists("testuser"))
+            with self.assertRaises(LoginNotFoundError):
+                self.pm.get_password("testuser")
+    
+    def test_custom_prefix_and_region(self):
+        """Test custom prefix and region initialization."""
+        pm_custom = PasswordManager("/custom-prefix/", "us-west-2", boto3_session=_SESSION)
         
-        with self.assertRaises(ValidationError):
-            self.pm.rotate_password("")
+        # Test that prefix is used correctly
+        pm_custom.create_login("testuser", "password123")
+        password = pm_custom.get_password("testuser")
+        self.assertEqual(password, "password123")
+
+    def test_shared_session(self):
+        """Test initialization from an existing boto3 session."""
+        session = boto3.session.Session(region_name="us-west-2")
+        pm_session = PasswordManager("/session-prefix/", boto3_session=session)
+        
+        self.assertEqual(pm_session.ssm.meta.region_name, "us-west-2")
+        pm_session.create_login("testuser", "password123")
+        self.assertEqual(pm_session.get_password("testuser"), "password123")
+
+    def test_get_password_manager(self):
+        """Test shared instances are reused per prefix and region."""
+        pm1 = get_password_manager("/shared-prefix/", "us-west-2")
+        pm2 = get_password_manager("/shared-prefix/", "us-west-2")
+        pm3 = get_password_manager("/other-prefix/", "us-west-2")
+        
+        self.assertIs(pm1, pm2)
+        self.assertIsNot(pm1, pm3)
+        self.assertEqual(pm3.prefix, "/other-prefix/")
+
+    def test_client_config(self):
+        """Test client configuration is merged over library defaults."""
+        from botocore.config import Config
         
-        with self.assertRaises(ValidationError):
-            self.pm.login_exists("")
+        self.assertEqual(self.pm.ssm.meta.config.retries, {'total_max_attempts': 3, 'mode': 'adaptive'})
+        self.assertEqual(self.pm.ssm.meta.config.read_timeout, 3.0)
         
-        with self.assertRaises(ValidationError):
-            self.pm.get_login_info("")
+        pm_config = PasswordManager("/test-passwords/", boto3_session=_SESSION, config=Config(max_pool_connections=3))
+        self.assertEqual(pm_config.ssm.meta.config.max_pool_connections, 3)
+        self.assertEqual(pm_config.ssm.meta.config.read_timeout, 3.0)
+
+
+class TestPasswordManagerPure(unittest.TestCase):
+    """Test cases for PasswordManager logic that never calls AWS."""
+    
+    def setUp(self):
+        """Set up a PasswordManager without creating a boto3 client."""
+        self.pm = PasswordManager.__new__(PasswordManager)
+        self.pm.ssm = MagicMock()
+        self.pm.prefix = "/test-passwords/"
+    
+    def test_validation_errors(self):
+        """Test validation for empty inputs."""
+        cases = [
+            ("create_login", ("",)),
+            ("update_login", ("", "password")),
+            ("update_login", ("user", "")),
+            ("delete_login", ("",)),
+            ("get_password", ("",)),
+            ("rotate_password", ("",)),
+            ("login_exists", ("",)),
+            ("verify_password", ("", "password")),
+            ("get_login_info", ("",)),
+        ]
+        
+        for method, args in cases:
+            with self.subTest(method=method, args=args), self.assertRaises(ValidationError):
+                getattr(self.pm, method)(*args)
     
     def test_password_generation(self):
         """Test password generation function."""
@@ -240,67 +390,10 @@ class TestPasswordManagerLibrary(unittest.TestCase):
         # Test minimum length enforcement
         min_password = self.pm._generate_password(4)
         self.assertEqual(len(min_password), 8)  # Should be enforced to minimum
-    
-    @mock_aws
-    def test_custom_prefix_and_region(self):
-        """Test custom prefix and region initialization."""
-        pm_custom = PasswordManager("/custom-prefix/", "us-west-2")
-        
-        # Test that prefix is used correctly
-        pm_custom.create_login("testuser", "password123")
-        password = pm_custom.get_password("testuser")
-        self.assertEqual(password, "password123")
-
-
-class TestIntegrationWorkflow(unittest.TestCase):
-    """Integration tests using actual mocked AWS services."""
-    
-    @mock_aws
-    def test_full_workflow(self):
-        """Test complete workflow: create, list, get, update, rotate, delete."""
-        import os
-        os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
-        pm = PasswordManager("/integration-test/")
-        
-        # Start with empty list
-        self.assertEqual(pm.list_logins(), [])
         
-        # Create login
-        password1 = pm.create_login("testuser")
-        self.assertIsNotNone(password1)
-        
-        # Login should exist
-        self.assertTrue(pm.login_exists("testuser"))
-        
-        # List should show the login
-        self.assertEqual(pm.list_logins(), ["testuser"])
-        
-        # Get password
-        retrieved_password = pm.get_password("testuser")
-        self.assertEqual(retrieved_password, password1)
-        
-        # Get login info
-        info = pm.get_login_info("testuser")
-        self.assertEqual(info['type'], 'SecureString')
-        
-        # Update password
-        new_password = "updated_password_123"
-        pm.update_login("testuser", new_password)
-        self.assertEqual(pm.get_password("testuser"), new_password)
-        
-        # Rotate password
-        rotated_password = pm.rotate_password("testuser")
-        self.assertNotEqual(rotated_password, new_password)
-        self.assertEqual(pm.get_password("testuser"), rotated_password)
-        
-        # Delete login
-        pm.delete_login("testuser")
-        self.assertEqual(pm.list_logins(), [])
-        self.assertFalse(pm.login_exists("testuser"))
-        
-        # Verify it's gone
-        with self.assertRaises(LoginNotFoundError):
-            pm.get_password("testuser")
+        # Only characters from the password alphabet are used
+        alphabet = set(string.ascii_letters + string.digits + "!@#$%^&*")
+        self.assertTrue(set(self.pm._generate_password(256)) <= alphabet)
 
 
 if __name__ == '__main__':
@@ -312,4 +405,18 @@ if __name__ == '__main__':
         print("Install with: pip install moto[ssm]")
         sys.exit(1)
     
-    unittest.main(verbosity=2)
\ No newline at end of file
+    # Run this suite together with test_app.py. Tests are independent and 
+    # moto state is per process, so run them across all cores when 
+    # pytest-xdist is available
+    test_dir = os.path.dirname(os.path.abspath(__file__))
+    test_files = [os.path.join(test_dir, name) for name in ("test_password_manager.py", "test_app.py")]
+    import importlib.util
+    if importlib.util.find_spec("pytest") and importlib.util.find_spec("xdist"):
+        import pytest
+        sys.exit(pytest.main(test_files + ["-n", "auto", "-q"]))
+    
+    suite = unittest.defaultTestLoader.loadTestsFromNames(
+        [os.path.splitext(os.path.basename(path))[0] for path in test_files]
+    )
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+    sys.exit(not result.wasSuccessful())
\ No newline at end of file